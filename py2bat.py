@@ -1,13 +1,13 @@
 import re
 import ast
+import sys
 import json
 from functools import partial
 
+from simplify import eliminate_dead_code
+
 TEST_CASE = 'print_numbers.txt'
 
-with open(TEST_CASE, 'r') as f:
-    tree = ast.parse(f.read())
-  
 def serialize_ast(node):
     if isinstance(node, list):
         return list(map(serialize_ast, node))
@@ -20,9 +20,10 @@ def serialize_ast(node):
         result[field] = serialize_ast(getattr(node, field))
     return result
 
-json_dump = json.dumps(serialize_ast(tree), indent=4, sort_keys=True)
-noquotes = re.sub(r'"(.+)":', r'\1:', json_dump)
-fancyclassnames = re.sub(r'{\s*CLASS\: "(.+)",?', r'{ --\1--', noquotes)
+def fancy_dump(tree):
+    json_dump = json.dumps(serialize_ast(tree), indent=4, sort_keys=True)
+    noquotes = re.sub(r'"(.+)":', r'\1:', json_dump)
+    return re.sub(r'{\s*CLASS\: "(.+)",?', r'{ --\1--', noquotes)
 
 
 def get_unique_name(prefix='var'):
@@ -254,6 +255,10 @@ def ast_to_bat(node, state=ParsingState(delayed_expansion=True)):
         cond, cond_prefix = ast_to_bat(node.test, state.clone())
         return body_prefix + '\n:{0}\n{3}\nIF NOT "{1}"=="0" (\n{2}\ngoto :{0}\n)\n:{0}_end'.format(loopname, cond, body, cond_prefix), ''
     
+    # cmd rejects empty ( ) blocks, so pass becomes a no-op
+    if isinstance(node, ast.Pass):
+        return 'rem', ''
+
     if isinstance(node, ast.Break):
         if state.loopname:
             return 'goto :{0}_end'.format(state.loopname), ''
@@ -293,12 +298,22 @@ def ast_to_bat(node, state=ParsingState(delayed_expansion=True)):
 def strip_odd_linebreaks(text):
     return re.sub(r'\n+', r'\n', text)
 
-def make_bat():
+# Returns the batch script and the number of lines removed as dead code
+def translate(source, dead_code_elimination=True):
+    tree = ast.parse(source)
+    removed_lines = 0
+    if dead_code_elimination:
+        tree, removed_lines = eliminate_dead_code(tree)
     result = strip_odd_linebreaks(ast_to_bat(tree)[0])
-    result = '@echo off\nsetlocal ENABLEDELAYEDEXPANSION\n' + result
+    return '@echo off\nsetlocal ENABLEDELAYEDEXPANSION\n' + result, removed_lines
+
+def make_bat(dead_code_elimination=True):
+    with open(TEST_CASE, 'r') as f:
+        result, removed_lines = translate(f.read(), dead_code_elimination)
+    print('Dead code elimination removed {0} lines'.format(removed_lines))
     with open('battest.bat', 'w') as f:
         f.write(result)
     print(result)
 
-make_bat()
-#print(fancyclassnames)
\ No newline at end of file
+if __name__ == '__main__':
+    make_bat(dead_code_elimination='--no-dce' not in sys.argv)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import ast
 import copy
 import numbers
+import re
 import typing as typ
 
 class RewriteAssign(ast.NodeTransformer):
@@ -135,7 +136,7 @@ class AnnotateTypes(ast.NodeTransformer):
 class SymbolInfo:
     def __init__(self, **kwargs):
         self.type_constraints = []
-        for k, v in kwargs:
+        for k, v in kwargs.items():
             setattr(self, k, v)
             
     def add_constraint(self, constraint):
@@ -243,7 +244,7 @@ def get_simple_expr_type_constarints(expr):
         return [int] if isinstance(expr.n, numbers.Integral) else [float]
     elif isinstance(expr, ast.Str):
         return [str]
-    elif isinstance(expr, ast.NameConstant) 
+    elif isinstance(expr, ast.NameConstant):
         if expr.value in ['True', 'False']:
             return [bool]
         elif expr.value == 'None':
@@ -277,6 +278,308 @@ class ConstrainLiteralAssign(ast.NodeTransformer):
         constraints = get_simple_expr_type_constraints(node.value)
         node.targets[0].symbol_info.add_constraints(constraints)
 
+# Functions that are known to have no side effects
+PURE_BUILTINS = {'len', 'range', 'str', 'int', 'bool', 'abs', 'min', 'max'}
+
+# Builtins that read nothing but their own arguments
+ARGUMENT_ONLY_BUILTINS = PURE_BUILTINS | {'print', 'input', 'randint'}
+
+# Words of raw batch code that may name a variable. cmd reads variables
+# without delimiters too (set /a y=x+1, if defined x), so every word counts
+BATCH_WORD = re.compile(r'\w+')
+# Functions referenced by raw batch code: batch('call :f')
+BATCH_LABEL_REFERENCE = re.compile(r'(?:call|goto)\s+:(\w+)', re.IGNORECASE)
+
+# Returns the strings of a batch(...) call,
+# or None if the code is not known at compile time
+def get_batch_strings(call):
+    strings = []
+    for arg in call.args:
+        for child in ast.walk(arg):
+            if isinstance(child, (ast.Name, ast.Call, ast.Attribute, ast.Subscript)):
+                return None
+            if isinstance(child, ast.Str):
+                strings.append(child.s)
+    return strings
+
+# Returns every name that a batch(...) call may read,
+# or None if the code is not known at compile time
+def get_batch_references(call):
+    strings = get_batch_strings(call)
+    if strings is None:
+        return None
+    return {name for string in strings for name in BATCH_WORD.findall(string)}
+
+def has_batch_label_reference(call):
+    strings = get_batch_strings(call)
+    return strings is None or any(BATCH_LABEL_REFERENCE.search(string) for string in strings)
+
+# Returns names that may be read when the node runs,
+# or None if any variable may be read (e.g. by a user function)
+def get_read_names(node):
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            names.add(child.id)
+        elif isinstance(child, ast.AugAssign) and isinstance(child.target, ast.Name):
+            names.add(child.target.id)
+        elif isinstance(child, ast.Call):
+            if not isinstance(child.func, ast.Name):
+                return None
+            if child.func.id == 'batch':
+                # Calling a label runs a user function, which may read anything
+                if has_batch_label_reference(child):
+                    return None
+                names.update(get_batch_references(child))
+            elif child.func.id not in ARGUMENT_ONLY_BUILTINS:
+                return None
+    return names
+
+# Collects usage info for every symbol: how many times it is read
+# and, for functions, the FunctionDef node itself.
+# Batch has a single variable namespace, so all symbols go to one scope
+class CollectSymbolUsage(ast.NodeVisitor):
+    def __init__(self):
+        super().__init__()
+        self.scope = Scope('/')
+        # Set when raw batch code is built at runtime and may read anything
+        self.reads_everything = False
+        # Names stored by the assignment being visited: a variable read only
+        # to compute its own new value (count = count + 1) is not used
+        self.updated_names = set()
+
+    def getsymbol(self, name):
+        if not self.scope.hassymbol(name):
+            self.scope.setsymbol(name, SymbolInfo(name=name, reads=0, definition=None))
+        return self.scope.getsymbol(name)
+
+    def visit_FunctionDef(self, node):
+        self.getsymbol(node.name).definition = node
+        self.generic_visit(node)
+
+    # Methods are reached through attributes, they are not tracked as functions
+    def visit_ClassDef(self, node):
+        for stmt in node.body:
+            if isinstance(stmt, ast.FunctionDef):
+                self.generic_visit(stmt)
+            else:
+                self.visit(stmt)
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load) and node.id not in self.updated_names:
+            self.getsymbol(node.id).reads += 1
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self.visit(target)
+        self.visit_update(node.value, {target.id for target in node.targets if isinstance(target, ast.Name)})
+
+    def visit_AugAssign(self, node):
+        self.visit(node.target)
+        self.visit_update(node.value, {node.target.id} if isinstance(node.target, ast.Name) else set())
+
+    def visit_update(self, value, names):
+        previous = self.updated_names
+        self.updated_names = previous | names
+        self.visit(value)
+        self.updated_names = previous
+
+    # Variables and labels used inside of batch(...) strings are invisible to the AST
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == 'batch':
+            references = get_batch_references(node)
+            if references is None:
+                self.reads_everything = True
+            else:
+                for name in references:
+                    self.getsymbol(name).reads += 1
+        self.generic_visit(node)
+
+def has_side_effects(node, pure_functions):
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            if not (isinstance(child.func, ast.Name) and child.func.id in pure_functions):
+                return True
+        if isinstance(child, (ast.Global, ast.Nonlocal, ast.Raise, ast.Yield, ast.YieldFrom)):
+            return True
+    return False
+
+# Returns names of the functions whose calls may be dropped when the result is unused.
+# Batch has no local variables, so a function that stores any variable is impure.
+# Every user function starts as pure and is marked impure until nothing changes,
+# so that (mutually) recursive functions are handled
+def get_pure_functions(scope):
+    functions = {name: info.definition for name, info in scope.symbols.items() if info.definition}
+    pure_functions = PURE_BUILTINS | set(functions)
+    changed = True
+    while changed:
+        changed = False
+        for name, definition in functions.items():
+            if name not in pure_functions:
+                continue
+            stores = any(isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store) for stmt in definition.body for child in ast.walk(stmt))
+            if stores or any(has_side_effects(stmt, pure_functions) for stmt in definition.body):
+                pure_functions.discard(name)
+                changed = True
+    return pure_functions
+
+def is_unused_target(target, usage):
+    if usage.reads_everything:
+        return False
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return all(is_unused_target(el, usage) for el in target.elts)
+    if isinstance(target, ast.Name):
+        return not usage.scope.hassymbol(target.id) or usage.scope.getsymbol(target.id).reads == 0
+    return False
+
+def get_simple_store_names(stmt):
+    if isinstance(stmt, ast.Assign) and all(isinstance(target, ast.Name) for target in stmt.targets):
+        return {target.id for target in stmt.targets}
+    return None
+
+# Only print is known not to raise, anything else may leave the block halfway
+def may_raise(node):
+    return any(isinstance(child, ast.Call) and not (isinstance(child.func, ast.Name) and child.func.id == 'print') for child in ast.walk(node))
+
+def is_empty_body(stmts):
+    return all(isinstance(stmt, ast.Pass) for stmt in stmts)
+
+# Removes statements that can never run:
+# code after break/continue/return/raise and branches with a literal condition
+# Example:
+# if False:
+#     print(1)
+# while True:
+#     break
+#     print(2)
+# is converted to
+# while True:
+#     break
+class RemoveUnreachable(ast.NodeTransformer):
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for field in ('body', 'orelse', 'finalbody'):
+            stmts = getattr(node, field, None)
+            if not isinstance(stmts, list) or not all(isinstance(stmt, ast.stmt) for stmt in stmts):
+                continue
+            for i, stmt in enumerate(stmts):
+                if isinstance(stmt, (ast.Break, ast.Continue, ast.Return, ast.Raise)):
+                    del stmts[i + 1:]
+                    break
+            if not is_empty_body(stmts):
+                stmts[:] = [stmt for stmt in stmts if not isinstance(stmt, ast.Pass)]
+            if not stmts and field == 'body' and not isinstance(node, ast.Module):
+                stmts.append(ast.Pass())
+        return node
+
+    def visit_If(self, node):
+        node = self.generic_visit(node)
+        if is_literal(node.test):
+            return node.body if ast.literal_eval(node.test) else node.orelse
+        return node
+
+    def visit_While(self, node):
+        node = self.generic_visit(node)
+        if is_literal(node.test) and not ast.literal_eval(node.test):
+            return node.orelse
+        return node
+
+# Removes assignments to variables that are never read, functions that are never called
+# and ifs and for loops that are left with nothing to do.
+# Assignments whose value has side effects (print, input, batch, impure calls) are kept.
+# Reads are counted in the whole program, regardless of order, and within every block
+# a store is also dead when the same variable is stored again before it may be read:
+# x = 1
+# x = 2
+# print(x)
+# is converted to
+# x = 2
+# print(x)
+class RemoveDeadStores(ast.NodeTransformer):
+    def __init__(self, usage):
+        super().__init__()
+        self.usage = usage
+        self.pure_functions = get_pure_functions(usage.scope)
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for field in ('body', 'orelse', 'finalbody'):
+            stmts = getattr(node, field, None)
+            # Handlers may see any store made in a try body
+            if isinstance(node, ast.Try) and field == 'body':
+                continue
+            if isinstance(stmts, list) and all(isinstance(stmt, ast.stmt) for stmt in stmts):
+                stmts[:] = self.remove_overwritten_stores(stmts)
+        return node
+
+    # Backward pass over a block, tracking variables that are
+    # definitely stored again later in the block before any read.
+    # Statements that may raise or jump out of the block end the tracking
+    def remove_overwritten_stores(self, stmts):
+        result = []
+        overwritten = set()
+        for stmt in reversed(stmts):
+            stores = get_simple_store_names(stmt)
+            if stores and stores <= overwritten and not has_side_effects(stmt.value, self.pure_functions):
+                continue
+            result.append(stmt)
+            reads = get_read_names(stmt)
+            escapes = any(isinstance(child, (ast.Break, ast.Continue, ast.Return, ast.Raise)) for child in ast.walk(stmt))
+            if reads is None or escapes or may_raise(stmt):
+                overwritten = set()
+            else:
+                overwritten = ((overwritten | stores) if stores else overwritten) - reads
+        return list(reversed(result))
+
+    def visit_FunctionDef(self, node):
+        if not getattr(node, 'is_method', False) and is_unused_target(ast.Name(id=node.name), self.usage):
+            return None
+        return self.generic_visit(node)
+
+    # Methods and class attributes are reached through attributes, so they are never removed
+    def visit_ClassDef(self, node):
+        for stmt in node.body:
+            if isinstance(stmt, ast.FunctionDef):
+                stmt.is_method = True
+            elif isinstance(stmt, (ast.Assign, ast.AugAssign)):
+                stmt.is_class_attribute = True
+        return self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        if getattr(node, 'is_class_attribute', False):
+            return node
+        if all(is_unused_target(target, self.usage) for target in node.targets) and not has_side_effects(node.value, self.pure_functions):
+            return None
+        return node
+
+    def visit_AugAssign(self, node):
+        if getattr(node, 'is_class_attribute', False):
+            return node
+        if is_unused_target(node.target, self.usage) and not has_side_effects(node.value, self.pure_functions):
+            return None
+        return node
+
+    # Pure standalone expressions, e.g. leftover `x + 1`
+    def visit_Expr(self, node):
+        if not has_side_effects(node.value, self.pure_functions):
+            return None
+        return node
+
+    def visit_If(self, node):
+        node = self.generic_visit(node)
+        if is_empty_body(node.body) and is_empty_body(node.orelse) and not has_side_effects(node.test, self.pure_functions):
+            return None
+        return node
+
+    def visit_For(self, node):
+        node = self.generic_visit(node)
+        if is_empty_body(node.body) and is_empty_body(node.orelse) and is_unused_target(node.target, self.usage) and not has_side_effects(node.iter, self.pure_functions):
+            return None
+        return node
+
+def count_statement_lines(node):
+    return len({stmt.lineno for stmt in ast.walk(node) if isinstance(stmt, ast.stmt) and hasattr(stmt, 'lineno')})
+
 # TODO: Annotate types for calls, literals, etc
 # TODO: Constrain iterators
 
@@ -292,4 +595,19 @@ def annotate_ast(node):
     result = node
     for transformer in [AnnotateSymbolInfo, AnnotateLiteralAssign]:
         result = transformer().visit(result)
-    return result
\ No newline at end of file
+    return result
+
+# Repeats dead code removal until the tree stops changing, since removing
+# one store may leave the variables it read unused as well.
+# Returns the new tree and the number of removed lines
+def eliminate_dead_code(node):
+    lines_before = count_statement_lines(node)
+    result = RemoveUnreachable().visit(node)
+    while True:
+        usage = CollectSymbolUsage()
+        usage.visit(result)
+        before = ast.dump(result)
+        result = RemoveUnreachable().visit(RemoveDeadStores(usage).visit(result))
+        if ast.dump(result) == before:
+            break
+    return result, lines_before - count_statement_lines(result)
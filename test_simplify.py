@@ -0,0 +1,118 @@
+import ast
+
+import py2bat
+from simplify import eliminate_dead_code
+
+def eliminate(source):
+    tree, removed_lines = eliminate_dead_code(ast.parse(source))
+    return ast.unparse(tree), removed_lines
+
+def test_side_effects_are_kept():
+    source = (
+        "print(1)\n"
+        "a = input('name? ')\n"
+        "batch('echo hi')\n"
+        "b = randint(1, 6)\n"
+        "def noisy():\n"
+        "    print('hi')\n"
+        "c = noisy()\n"
+        "noisy()\n"
+    )
+    code, removed_lines = eliminate(source)
+    assert code == ast.unparse(ast.parse(source))
+    assert removed_lines == 0
+
+def test_if_false_is_folded():
+    code, removed_lines = eliminate("if False:\n    print(1)\nelse:\n    print(2)\n")
+    assert code == "print(2)"
+    assert removed_lines == 2
+
+def test_while_false_keeps_else():
+    code, removed_lines = eliminate("while False:\n    print(1)\nelse:\n    print(2)\n")
+    assert code == "print(2)"
+    assert removed_lines == 2
+
+def test_code_after_break_is_removed():
+    code, removed_lines = eliminate("while True:\n    print(1)\n    break\n    print(2)\n    print(3)\n")
+    assert code == "while True:\n    print(1)\n    break"
+    assert removed_lines == 2
+
+def test_unused_stores_and_functions_are_removed():
+    code, removed_lines = eliminate("a = 1\nb = a + 2\ndef f():\n    return 3\nprint(4)\n")
+    assert code == "print(4)"
+    assert removed_lines == 4
+
+def test_statements_sharing_a_line_are_removed():
+    code, removed_lines = eliminate("a = 1; b = a\nprint(2)\n")
+    assert code == "print(2)"
+    assert removed_lines == 1
+
+def test_overwritten_store_is_removed():
+    code, removed_lines = eliminate("x = 1\nx = 2\nprint(x)\n")
+    assert code == "x = 2\nprint(x)"
+    assert removed_lines == 1
+
+def test_function_storing_a_variable_is_impure():
+    source = "def f():\n    x = 5\nx = 1\nf()\nprint(x)\n"
+    code, removed_lines = eliminate(source)
+    assert code == ast.unparse(ast.parse(source))
+
+def test_batch_references_are_reads():
+    for source in [
+        "x = 5\nbatch('echo %x:~0,1%')\n",
+        "x = 5\nbatch('echo ' + '!x!')\n",
+        "x = 5\ny = 'echo '\nbatch(y + '!z!')\n",
+        "def f():\n    print(1)\nbatch('call :f')\n",
+    ]:
+        code, removed_lines = eliminate(source)
+        assert code == ast.unparse(ast.parse(source))
+
+def test_methods_are_kept():
+    source = "class A:\n\n    def m(self):\n        print(1)\nA().m()\n"
+    code, removed_lines = eliminate(source)
+    assert code == ast.unparse(ast.parse(source))
+
+def test_emptied_blocks_translate():
+    result, removed_lines = py2bat.translate("for k in range(3):\n    d = k\nprint(k)\n")
+    assert 'DO (\nrem\n)' in result
+    assert removed_lines == 1
+    result, removed_lines = py2bat.translate("i = 0\nwhile i < 3:\n    t = i\n    i += 1\nprint(1)\n")
+    assert 'set "t=' not in result
+    assert 'set "i=' in result
+    result, removed_lines = py2bat.translate("if input():\n    pass\n")
+    assert '(\nrem\n)' in result
+    result, removed_lines = py2bat.translate("if False:\n    print(1)\nelse:\n    pass\n")
+    assert result.endswith('\nrem')
+
+def test_dead_code_elimination_can_be_disabled():
+    result, removed_lines = py2bat.translate("a = 1\nprint(2)\n", dead_code_elimination=False)
+    assert 'set "a=1"' in result
+    assert removed_lines == 0
+
+def test_class_attributes_are_kept():
+    source = "class A:\n    x = 1\nprint(A.x)\n"
+    code, removed_lines = eliminate(source)
+    assert code == ast.unparse(ast.parse(source))
+
+def test_bare_batch_words_are_reads():
+    for source in [
+        "x = 5\nbatch('set /a y=x+1')\n",
+        "x = 5\nbatch('if defined x echo yes')\n",
+    ]:
+        code, removed_lines = eliminate(source)
+        assert code == ast.unparse(ast.parse(source))
+
+def test_batch_call_reads_everything():
+    source = "def f():\n    print(x)\nx = 1\nbatch('call :f')\nx = 2\nbatch('call :f')\n"
+    code, removed_lines = eliminate(source)
+    assert code == ast.unparse(ast.parse(source))
+
+def test_store_before_raising_statement_is_kept():
+    source = "try:\n    x = 1\n    x = int(input())\nexcept ValueError:\n    print(x)\n"
+    code, removed_lines = eliminate(source)
+    assert code == ast.unparse(ast.parse(source))
+
+def test_self_updated_counter_is_removed():
+    code, removed_lines = eliminate("count = 0\nfor i in range(10):\n    count = count + 1\nprint(1)\n")
+    assert code == "print(1)"
+    assert removed_lines == 3